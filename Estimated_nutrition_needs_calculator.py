@@ -1,4 +1,5 @@
 import streamlit as st
+from facility_profiles import DEFAULT_PROFILE, registry
 
 # Streamlit UI
 st.title("Estimated Nutrition Needs Calculator")
@@ -6,6 +7,38 @@ st.write(f"""
 
 ***This page was created by Leah Newmark, RD, CNSC and Machine Learning Engineer***""")
 
+# Facility coefficient profiles (facilities/<id>.json); a link can preselect one with ?facility=<id>
+# Load errors go to the server log (see facility_profiles); the page only flags the selected facility
+facilities = registry.snapshot()
+facility_options = ["default"] + sorted(facility_id for facility_id in facilities.profiles if facility_id != "default")
+requested_facility = st.query_params.get("facility", "default").lower()
+unknown_facility = requested_facility not in facility_options
+if unknown_facility:
+    requested_facility = "default"
+# Drop a remembered choice whose facility was removed so the selectbox can't hold a stale option
+if st.session_state.get("facility") not in facility_options:
+    st.session_state.pop("facility", None)
+if len(facility_options) > 1:
+    selected_facility = st.selectbox(
+        "Select Facility", facility_options,
+        index=facility_options.index(requested_facility),
+        format_func=lambda facility_id: facilities.profiles.get(facility_id, DEFAULT_PROFILE).name,
+        key="facility",
+    )
+else:
+    selected_facility = "default"
+if selected_facility != requested_facility:
+    # Keep the choice in the URL so it survives a reload or a shared link
+    if selected_facility == "default":
+        del st.query_params["facility"]
+    else:
+        st.query_params["facility"] = selected_facility
+if unknown_facility and selected_facility == "default":
+    st.warning("The facility in this link was not found; using the default protocol, not your facility's.")
+if selected_facility in facilities.failed:
+    st.warning("This facility's latest configuration could not be loaded; showing its last saved protocol.")
+profile = facilities.profiles.get(selected_facility, DEFAULT_PROFILE)
+
 
 def calculate_bmi(weight, height):
     if height == 0:
@@ -59,7 +92,7 @@ else:
     # Calculate Macronutrient Needs
     protein_min = (0.15 * tdee) / 4  # 15% of calories from protein
     protein_max = (0.35 * tdee) / 4  # 35% of calories from protein
-    protein_min = max(protein_min, 65)  # Ensure a minimum of 65g protein per day
+    protein_min = max(protein_min, profile.protein_min_g)  # Ensure the facility's minimum protein per day
 
     #st.write(f"**Recommended Protein Intake:** {protein_min:.1f}g - {protein_max:.1f}g per day")
 
@@ -114,9 +147,14 @@ if selected_disease == "ARDS (Acute Lung Injury)/ Ventilated":
         # Obese patient (BMI = 30-50)
         st.subheader("Obese Patient")
         if age < 60: 
-            st.write(f"For obese patients under 60, use ASPEN guidelines (11-14 kcal/kg of actual body weight BMI 30-50).")
-            tdee_low = 11 * weight
-            tdee_high = 14 * weight
+            kcal_low, kcal_high = profile.icu_obese_kcal_per_kg
+            if profile.icu_obese_kcal_per_kg == DEFAULT_PROFILE.icu_obese_kcal_per_kg:
+                guideline = "ASPEN guidelines"
+            else:
+                guideline = f"the {profile.name} protocol"
+            st.write(f"For obese patients under 60, use {guideline} ({kcal_low:g}-{kcal_high:g} kcal/kg of actual body weight BMI 30-50).")
+            tdee_low = kcal_low * weight
+            tdee_high = kcal_high * weight
             st.write(f"**Estimated Energy Needs:** {tdee_low:.0f} - {tdee_high:.0f} kcal/day")
         else:
             st.write(f"For obese patients over 60, use the Modified Penn State Equation.")
@@ -129,9 +167,14 @@ if selected_disease == "ARDS (Acute Lung Injury)/ Ventilated":
     
     else:
         if age < 60: 
-            st.write("For obese patients with BMI >50 who are under 60, use ASPEN guidelines (22-25 kcal/kg of actual body weight BMI 30-50).")
-            tdee_low = 22 * weight
-            tdee_high = 25 * weight
+            kcal_low, kcal_high = profile.icu_super_obese_kcal_per_kg
+            if profile.icu_super_obese_kcal_per_kg == DEFAULT_PROFILE.icu_super_obese_kcal_per_kg:
+                guideline = "ASPEN guidelines"
+            else:
+                guideline = f"the {profile.name} protocol"
+            st.write(f"For obese patients with BMI >50 who are under 60, use {guideline} ({kcal_low:g}-{kcal_high:g} kcal/kg of actual body weight BMI 30-50).")
+            tdee_low = kcal_low * weight
+            tdee_high = kcal_high * weight
             st.write(f"**Estimated Energy Needs:** {tdee_low:.0f} - {tdee_high:.0f} kcal/day")
         else:
             st.write("For obese patients over 60, use the Modified Penn State Equation.")
@@ -224,8 +267,8 @@ elif selected_disease == "Cerebral vascular disease":
     """)
 
     # Fluid Needs
-    fluid_low = 25 * weight
-    fluid_high = 35 * weight
+    fluid_low = profile.disease_fluid_ml_per_kg[0] * weight
+    fluid_high = profile.disease_fluid_ml_per_kg[1] * weight
     st.write(f"""
     **Fluid Needs:**  
     - {fluid_low:.0f} to {fluid_high:.0f} ml/day; emphasize non-energy containing fluids  
@@ -318,11 +361,11 @@ elif selected_disease == "Diabetes":
     """)
 
     # Fluid Needs
-    fluid_low = 25 * weight
-    fluid_high = 35 * weight
+    fluid_low = profile.disease_fluid_ml_per_kg[0] * weight
+    fluid_high = profile.disease_fluid_ml_per_kg[1] * weight
     st.write(f"""
     **Fluid Needs:**  
-    - {fluid_low:.0f} to {fluid_high:.0f} ml/day (25-35 ml/kg)
+    - {fluid_low:.0f} to {fluid_high:.0f} ml/day ({profile.disease_fluid_ml_per_kg[0]:g}-{profile.disease_fluid_ml_per_kg[1]:g} ml/kg)
     """)
 
 elif selected_disease == "Heart failure":
@@ -393,6 +436,10 @@ elif selected_disease == "Liver":
     """)
 
 elif selected_disease == "Obese (non critical care)":
+    if profile.protein_min_g == DEFAULT_PROFILE.protein_min_g:
+        protein_floor_text = "65-70"
+    else:
+        protein_floor_text = f"{profile.protein_min_g:g} ({profile.name} protocol)"
     st.subheader("Obese (Non-Critical Care) Nutrition Recommendations")
 
     # Energy Needs
@@ -406,7 +453,7 @@ elif selected_disease == "Obese (non critical care)":
     st.write(f"""
     **Protein Needs:**  
     - Estimated protein intake: {protein_min:.1f} to {protein_max:.1f} grams/day (Individualized to provide 15% to 35% of energy as protein.)  
-    - Minimum of 65-70 grams protein/day
+    - Minimum of {protein_floor_text} grams protein/day
     """)
 
 elif selected_disease == "Pancreatitis":
@@ -486,12 +533,13 @@ elif selected_disease == "Trauma":
     if weight > 0:
         # Energy calculation based on intubated or non-intubated status
         if st.selectbox("Is the patient intubated?", ["Yes", "No"]) == "Yes":
-            energy = 20 * weight  # 20-25 kcal/kg for intubated patients
-            energy_high = 25 * weight
+            kcal_low, kcal_high = profile.icu_intubated_kcal_per_kg
+            energy = kcal_low * weight  # 20-25 kcal/kg for intubated patients by default
+            energy_high = kcal_high * weight
             st.write(f"""- Energy: Indirect calorimetry (gold standard)
             - The Penn State Equation (PSU) 2003b calculates resting energy expenditure and is supported by Academy of Nutrition and Dietetics (may be calculated using the ADA Nutrition Care Manual) nonobese patients
 Mifflin-St Jeor (ASPEN and AND) Obese and nonobese patients. Select 'ARDS (Acute Lung Injury)/ Ventilated' from drop down to calculate Penn State for intubated pts
-            - Use clinical judgment: 20-25 kcal/kg (intubated): {energy:.0f} - {energy_high:.0f} kcal/day""")
+            - Use clinical judgment: {kcal_low:g}-{kcal_high:g} kcal/kg (intubated): {energy:.0f} - {energy_high:.0f} kcal/day""")
         else:
             energy = 25 * weight  # 25-35 kcal/kg for non-intubated patients
             energy_high = 35 * weight
@@ -0,0 +1,187 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+
+# Directory holding one JSON file per facility; the file name (without .json) is the facility id
+FACILITY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "facilities")
+
+# Don't stat the config directory more often than this (seconds)
+RELOAD_CHECK_INTERVAL = 2.0
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class FacilityProfile:
+    facility_id: str
+    name: str
+    protein_min_g: float = 65  # Minimum protein floor (g/day)
+    icu_obese_kcal_per_kg: tuple = (11, 14)  # Ventilated, BMI 30-50, actual body weight
+    icu_super_obese_kcal_per_kg: tuple = (22, 25)  # Ventilated, BMI >50
+    icu_intubated_kcal_per_kg: tuple = (20, 25)  # Trauma, intubated
+    disease_fluid_ml_per_kg: tuple = (25, 35)  # CVD/Diabetes fluid needs
+
+
+DEFAULT_PROFILE = FacilityProfile(facility_id="default", name="Default")
+
+_RANGE_FIELDS = (
+    "icu_obese_kcal_per_kg", "icu_super_obese_kcal_per_kg", "icu_intubated_kcal_per_kg",
+    "disease_fluid_ml_per_kg",
+)
+_ALLOWED_KEYS = {"name", "protein_min_g", *_RANGE_FIELDS}
+
+
+def _number(value, key, path):
+    if (isinstance(value, bool) or not isinstance(value, (int, float))
+            or not math.isfinite(value) or value <= 0):
+        raise ValueError(f"{path}: '{key}' must be a positive number")
+    return value
+
+
+def compile_profile(facility_id, data, path="<config>"):
+    """Validate raw config data and turn it into an immutable FacilityProfile."""
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected a JSON object")
+    unknown = set(data) - _ALLOWED_KEYS
+    if unknown:
+        raise ValueError(f"{path}: unknown keys {sorted(unknown)}")
+
+    fields = {"facility_id": facility_id, "name": str(data.get("name", facility_id))}
+    if "protein_min_g" in data:
+        fields["protein_min_g"] = _number(data["protein_min_g"], "protein_min_g", path)
+    for key in _RANGE_FIELDS:
+        if key not in data:
+            continue
+        value = data[key]
+        if not isinstance(value, list) or len(value) != 2:
+            raise ValueError(f"{path}: '{key}' must be a [low, high] pair")
+        low, high = (_number(v, key, path) for v in value)
+        if low > high:
+            raise ValueError(f"{path}: '{key}' low value is greater than high value")
+        fields[key] = (low, high)
+    return FacilityProfile(**fields)
+
+
+def _directory_signature(directory):
+    # (file name, mtime, size) for every config file; changes when a file is added, edited or removed
+    try:
+        entries = os.scandir(directory)
+    except FileNotFoundError:
+        return ()
+    signature = []
+    with entries:
+        for entry in entries:
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue  # Removed or renamed since the directory was listed
+            signature.append((entry.name, stat.st_mtime_ns, stat.st_size))
+    return tuple(sorted(signature))
+
+
+@dataclass(frozen=True)
+class ProfileSnapshot:
+    profiles: MappingProxyType  # {facility_id: FacilityProfile}
+    errors: tuple = ()
+    failed: frozenset = frozenset()  # Facility ids whose file could not be loaded
+
+
+EMPTY_SNAPSHOT = ProfileSnapshot(profiles=MappingProxyType({}))
+
+
+def load_profiles(directory, signature=None, previous=EMPTY_SNAPSHOT):
+    """Parse the facility files listed in `signature` (scanned from `directory` if not given).
+
+    A file that cannot be loaded is reported in `errors`; if `previous` has a profile
+    for that facility it is kept, so a half-written or mistyped file never switches a
+    facility back to the default protocol.
+    """
+    if signature is None:
+        signature = _directory_signature(directory)
+    profiles = {}
+    errors = []
+    failed = set()
+    for file_name, _, _ in signature:
+        facility_id = file_name[:-len(".json")].lower()
+        path = os.path.join(directory, file_name)
+        if facility_id in profiles or facility_id in failed:
+            errors.append(f"{path}: facility id '{facility_id}' is defined by more than one file")
+            profiles.pop(facility_id, None)
+            failed.add(facility_id)
+            continue
+        try:
+            with open(path, encoding="utf-8") as f:
+                profiles[facility_id] = compile_profile(facility_id, json.load(f), path)
+        except json.JSONDecodeError as e:
+            errors.append(f"{path}: invalid JSON ({e})")
+            failed.add(facility_id)
+        except (OSError, ValueError) as e:
+            errors.append(str(e))
+            failed.add(facility_id)
+
+    for facility_id in sorted(failed):
+        if facility_id in previous.profiles:
+            profiles[facility_id] = previous.profiles[facility_id]
+            errors.append(f"Keeping the last good profile for '{facility_id}'")
+    return ProfileSnapshot(
+        profiles=MappingProxyType(profiles), errors=tuple(errors), failed=frozenset(failed),
+    )
+
+
+class ProfileRegistry:
+    """Process-wide cache of facility profiles that reloads when the config files change."""
+
+    def __init__(self, directory=FACILITY_DIR, check_interval=RELOAD_CHECK_INTERVAL):
+        self.directory = directory
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._signature = None
+        self._next_check = 0.0
+        self._snapshot = EMPTY_SNAPSHOT
+
+    def _refresh(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        with self._lock:
+            if now < self._next_check:
+                return
+            signature = _directory_signature(self.directory)
+            if signature != self._signature:
+                # Profiles and errors are swapped together as one immutable snapshot
+                self._snapshot = load_profiles(self.directory, signature, self._snapshot)
+                self._signature = signature
+                for error in self._snapshot.errors:
+                    logger.warning("Facility profile problem: %s", error)
+            self._next_check = now + self.check_interval
+
+    def snapshot(self):
+        """Return the current ProfileSnapshot; read profiles and errors from the same one."""
+        self._refresh()
+        return self._snapshot
+
+    @property
+    def errors(self):
+        return self.snapshot().errors
+
+    def facility_ids(self):
+        return sorted(self.snapshot().profiles)
+
+    def get(self, facility_id):
+        """Return the profile for `facility_id`, or DEFAULT_PROFILE if it is unknown."""
+        profiles = self.snapshot().profiles
+        if not facility_id:
+            return DEFAULT_PROFILE
+        return profiles.get(facility_id.lower(), DEFAULT_PROFILE)
+
+
+registry = ProfileRegistry()
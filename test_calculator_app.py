@@ -0,0 +1,105 @@
+import json
+import os
+
+import pytest
+
+import facility_profiles
+from facility_profiles import ProfileRegistry
+
+AppTest = pytest.importorskip("streamlit.testing.v1").AppTest
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Estimated_nutrition_needs_calculator.py")
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    with open(tmp_path / "a.json", "w", encoding="utf-8") as f:
+        json.dump({
+            "name": "A Hospital",
+            "protein_min_g": 80,
+            "icu_super_obese_kcal_per_kg": [12, 15],
+            "disease_fluid_ml_per_kg": [30, 40],
+        }, f)
+    monkeypatch.setattr(facility_profiles, "registry", ProfileRegistry(str(tmp_path), check_interval=0))
+    return AppTest.from_file(APP, default_timeout=30)
+
+
+def widget(widgets, label):
+    return next(w for w in widgets if w.label == label)
+
+
+def page_text(at):
+    return "\n".join(m.value for m in at.markdown)
+
+
+def run_with(at, disease, weight=70.0, height=170.0, age=40):
+    widget(at.number_input, "Enter weight (kg)").set_value(weight)
+    widget(at.number_input, "Enter height (cm)").set_value(height)
+    widget(at.number_input, "Enter age (years)").set_value(age)
+    widget(at.selectbox, "Select Disease State").set_value(disease)
+    return at.run()
+
+
+def test_default_run_uses_default_coefficients(app):
+    at = app.run()
+    assert not at.exception
+    # The first run's tiny default weight/height puts BMI above 50
+    assert "use ASPEN guidelines (22-25 kcal/kg" in page_text(at)
+
+    run_with(at, "Cerebral vascular disease")
+    assert "1750 to 2450 ml/day" in page_text(at)
+
+    run_with(at, "Obese (non critical care)")
+    assert "Minimum of 65-70 grams protein/day" in page_text(at)
+    assert not at.warning
+
+
+def test_facility_run_uses_facility_profile(app):
+    at = app.run()
+    at.selectbox(key="facility").set_value("a").run()
+    assert not at.exception
+    assert at.query_params["facility"] == "a"
+    assert "use the A Hospital protocol (12-15 kcal/kg" in page_text(at)
+
+    run_with(at, "Cerebral vascular disease")
+    assert "2100 to 2800 ml/day" in page_text(at)
+
+    # 15% of TDEE is below the floor for this patient, so the facility minimum applies
+    run_with(at, "Obese (non critical care)", weight=50.0, height=150.0, age=80)
+    text = page_text(at)
+    assert "Estimated protein intake: 80.0 to" in text
+    assert "Minimum of 80 (A Hospital protocol) grams protein/day" in text
+
+
+def test_facility_link_preselects_and_unknown_link_warns(app):
+    app.query_params["facility"] = "a"
+    at = app.run()
+    assert at.selectbox(key="facility").value == "a"
+    assert not at.warning
+
+    at.query_params["facility"] = "typo"
+    at.session_state["facility"] = "default"
+    at.run()
+    assert at.selectbox(key="facility").value == "default"
+    assert "was not found" in at.warning[0].value
+
+
+def test_reload_keeps_selected_facility(app):
+    at = app.run()
+    at.selectbox(key="facility").set_value("a").run()
+    directory = facility_profiles.registry.directory
+
+    with open(os.path.join(directory, "b.json"), "w", encoding="utf-8") as f:
+        json.dump({"name": "B Hospital"}, f)
+    at.run()
+    assert at.selectbox(key="facility").options == ["Default", "A Hospital", "B Hospital"]
+    assert at.selectbox(key="facility").value == "a"
+
+    with open(os.path.join(directory, "a.json"), "w", encoding="utf-8") as f:
+        f.write('{"protein_min_g": 8')
+    at.run()
+    assert at.selectbox(key="facility").value == "a"
+    assert "use the A Hospital protocol (12-15 kcal/kg" in page_text(at)
+    assert [w.value for w in at.warning] == [
+        "This facility's latest configuration could not be loaded; showing its last saved protocol."
+    ]
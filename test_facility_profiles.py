@@ -0,0 +1,75 @@
+import json
+import os
+
+import pytest
+
+from facility_profiles import DEFAULT_PROFILE, ProfileRegistry, compile_profile
+
+
+def write_profile(directory, file_name, data):
+    with open(os.path.join(directory, file_name), "w", encoding="utf-8") as f:
+        f.write(data if isinstance(data, str) else json.dumps(data))
+
+
+def test_compile_profile_defaults_and_overrides():
+    profile = compile_profile("a", {"name": "A Hospital", "protein_min_g": 70, "disease_fluid_ml_per_kg": [30, 35]})
+    assert profile.name == "A Hospital"
+    assert profile.protein_min_g == 70
+    assert profile.disease_fluid_ml_per_kg == (30, 35)
+    assert profile.icu_obese_kcal_per_kg == DEFAULT_PROFILE.icu_obese_kcal_per_kg
+
+
+@pytest.mark.parametrize("data", [
+    [],
+    {"protien_min_g": 70},
+    {"protein_min_g": 0},
+    {"protein_min_g": True},
+    {"protein_min_g": "70"},
+    {"protein_min_g": float("nan")},
+    {"disease_fluid_ml_per_kg": [float("nan"), float("inf")]},
+    {"disease_fluid_ml_per_kg": [0, 35]},
+    {"disease_fluid_ml_per_kg": [35, 25]},
+    {"disease_fluid_ml_per_kg": [25]},
+])
+def test_compile_profile_rejects_invalid_values(data):
+    with pytest.raises(ValueError):
+        compile_profile("a", data)
+
+
+def test_registry_reloads_when_files_change(tmp_path):
+    registry = ProfileRegistry(str(tmp_path), check_interval=0)
+    assert registry.facility_ids() == []
+    assert registry.get("a") is DEFAULT_PROFILE
+
+    write_profile(tmp_path, "a.json", {"protein_min_g": 70})
+    assert registry.get("A").protein_min_g == 70
+
+    write_profile(tmp_path, "a.json", {"protein_min_g": 75})
+    assert registry.get("a").protein_min_g == 75
+
+    os.remove(tmp_path / "a.json")
+    assert registry.facility_ids() == []
+
+
+def test_registry_keeps_last_good_profile_on_bad_file(tmp_path):
+    registry = ProfileRegistry(str(tmp_path), check_interval=0)
+    write_profile(tmp_path, "a.json", {"protein_min_g": 70})
+    assert registry.get("a").protein_min_g == 70
+
+    write_profile(tmp_path, "a.json", '{"protein_min_g": 7')
+    snapshot = registry.snapshot()
+    assert snapshot.profiles["a"].protein_min_g == 70
+    assert snapshot.errors
+
+    write_profile(tmp_path, "a.json", {"protein_min_g": 72})
+    snapshot = registry.snapshot()
+    assert snapshot.profiles["a"].protein_min_g == 72
+    assert snapshot.errors == ()
+
+
+def test_registry_reports_duplicate_ids(tmp_path):
+    write_profile(tmp_path, "a.json", {"protein_min_g": 70})
+    write_profile(tmp_path, "A.json", {"protein_min_g": 75})
+    snapshot = ProfileRegistry(str(tmp_path), check_interval=0).snapshot()
+    assert "a" not in snapshot.profiles
+    assert any("more than one file" in error for error in snapshot.errors)